@@ -1,3 +1,4 @@
+import socket
 import subprocess
 import time
 import json
@@ -39,6 +40,39 @@ class TestGetWaitTime(unittest.TestCase):
         self.assertAlmostEqual(self.server.client_manager.get_wait_time(), expected_wait_time, places=2)
 
 
+class TestAudioCoalescing(unittest.TestCase):
+    def setUp(self):
+        self.server = TranscriptionServer()
+
+    def make_websocket(self, frames):
+        websocket = mock.MagicMock()
+
+        def fake_recv(timeout=None):
+            if frames:
+                return frames.pop(0)
+            raise TimeoutError
+
+        websocket.recv.side_effect = fake_recv
+        return websocket
+
+    def test_coalesces_buffered_frames(self):
+        frames = [
+            np.ones(4, dtype=np.float32).tobytes(),
+            np.full(4, 2, dtype=np.float32).tobytes(),
+        ]
+        websocket = self.make_websocket(frames)
+        frame_np = self.server.get_audio_from_websocket(websocket)
+        self.assertEqual(frame_np.shape[0], 8)
+        np.testing.assert_array_equal(frame_np[:4], np.ones(4, dtype=np.float32))
+
+    def test_buffered_end_of_audio_is_deferred(self):
+        frames = [np.ones(4, dtype=np.float32).tobytes(), b"END_OF_AUDIO"]
+        websocket = self.make_websocket(frames)
+        frame_np = self.server.get_audio_from_websocket(websocket)
+        self.assertEqual(frame_np.shape[0], 4)
+        self.assertFalse(self.server.get_audio_from_websocket(websocket))
+
+
 class TestServerConnection(unittest.TestCase):
     def setUp(self):
         self.server = TranscriptionServer()
@@ -78,7 +112,21 @@ class TestServerInferenceAccuracy(unittest.TestCase):
         cls.mock_pyaudio.return_value.open.return_value = mock.MagicMock()
         
         cls.server_process = subprocess.Popen(["python", "run_server.py"])
-        time.sleep(2)
+        cls.wait_for_server("localhost", 9090)
+
+    @staticmethod
+    def wait_for_server(host, port, timeout=30.0):
+        """Polls until the server accepts TCP connections instead of sleeping
+        a fixed amount, which was both slow for small models and flaky for
+        large ones."""
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            try:
+                socket.create_connection((host, port), timeout=0.5).close()
+                return
+            except OSError:
+                time.sleep(0.05)
+        raise RuntimeError(f"Server on {host}:{port} not ready after {timeout}s")
 
     @classmethod
     def tearDownClass(cls):
@@ -118,8 +118,12 @@ class Client:
 
         Client.INSTANCES[self.uid] = self
 
-        # start websocket client in a thread
-        self.ws_thread = threading.Thread(target=self.client_socket.run_forever)
+        # start websocket client in a thread; the stream is binary audio plus
+        # JSON we parse ourselves, so the per-frame UTF-8 scan is skipped
+        self.ws_thread = threading.Thread(
+            target=self.client_socket.run_forever,
+            kwargs={"skip_utf8_validation": True},
+        )
         self.ws_thread.daemon = True
         self.ws_thread.start()
 
@@ -337,7 +341,9 @@ class Client:
         """Waits a bit before disconnecting in order to process pending responses."""
         assert self.last_response_received
         while time.time() - self.last_response_received < self.disconnect_if_no_response_for:
-            continue
+            if not self.recording:
+                break
+            time.sleep(0.1)
 
 
 class TranscriptionTeeClient:
@@ -365,7 +371,9 @@ class TranscriptionTeeClient:
         self.save_output_recording = save_output_recording
         self.output_recording_filename = output_recording_filename
         self.mute_audio_playback = mute_audio_playback
-        self.frames = b""
+        # bytearray so appending audio chunks grows the buffer in place
+        # instead of reallocating an immutable bytes object per chunk.
+        self.frames = bytearray()
         self.p = pyaudio.PyAudio()
         try:
             self.stream = self.p.open(
@@ -647,7 +655,7 @@ class TranscriptionTeeClient:
                     if self.save_output_recording:
                         self.save_chunk(n_audio_file)
                         n_audio_file += 1
-                    self.frames = b""
+                    self.frames.clear()
             self.write_all_clients_srt()
 
         except KeyboardInterrupt:
@@ -144,12 +144,14 @@ class BackendType(Enum):
 
 class TranscriptionServer:
     RATE = 16000
+    MAX_COALESCE_BYTES = 256 * 1024
 
     def __init__(self):
         self.client_manager = None
         self.no_voice_activity_chunks = 0
         self.use_vad = True
         self.single_model = False
+        self.pending_end_of_audio = set()
 
     def initialize_client(
         self, websocket, options, faster_whisper_custom_model_path,
@@ -285,15 +287,41 @@ class TranscriptionServer:
         """
         Receives audio buffer from websocket and creates a numpy array out of it.
 
+        Consecutive frames that are already buffered on the connection are
+        coalesced into a single array (bounded by MAX_COALESCE_BYTES) so that
+        bursty clients cost one wake-up per burst instead of one per frame.
+
         Args:
             websocket: The websocket to receive audio from.
 
         Returns:
             A numpy array containing the audio.
         """
+        if websocket in self.pending_end_of_audio:
+            self.pending_end_of_audio.discard(websocket)
+            return False
+
         frame_data = websocket.recv()
         if frame_data == b"END_OF_AUDIO":
             return False
+
+        chunks = [frame_data]
+        coalesced_bytes = len(frame_data)
+        while coalesced_bytes < self.MAX_COALESCE_BYTES:
+            try:
+                extra = websocket.recv(timeout=0)
+            except (TimeoutError, TypeError, ConnectionClosed):
+                break
+            if extra == b"END_OF_AUDIO":
+                # Deliver the buffered audio first; signal EOF on the next call.
+                self.pending_end_of_audio.add(websocket)
+                break
+            if not isinstance(extra, (bytes, bytearray)):
+                break
+            chunks.append(extra)
+            coalesced_bytes += len(extra)
+        if len(chunks) > 1:
+            frame_data = b"".join(chunks)
         return np.frombuffer(frame_data, dtype=np.float32)
 
     def handle_new_connection(self, websocket, faster_whisper_custom_model_path,
@@ -387,6 +415,7 @@ class TranscriptionServer:
         except Exception as e:
             logging.error(f"Unexpected error: {str(e)}")
         finally:
+            self.pending_end_of_audio.discard(websocket)
             if self.client_manager.get_client(websocket):
                 self.cleanup(websocket)
                 websocket.close()
@@ -436,7 +465,12 @@ class TranscriptionServer:
                 trt_py_session=trt_py_session,
             ),
             host,
-            port
+            port,
+            # Audio frames are raw float32 PCM; permessage-deflate only burns
+            # CPU on them. Allow larger frames so coalescing clients are not
+            # capped at the default 1 MiB.
+            compression=None,
+            max_size=4 * 1024 * 1024
         ) as server:
             server.serve_forever()
 